@@ -1,4 +1,5 @@
 import ast
+import re
 
 def analyze_structure(code_string):
     """
@@ -37,4 +38,20 @@ def analyze_structure(code_string):
             if hasattr(node.func, 'id') and node.func.id == 'print':
                 results['concepts_found'].append('print_statement')
 
+    # Each concept once, in first-seen order
+    results['concepts_found'] = list(dict.fromkeys(results['concepts_found']))
     return results
+
+
+ERROR_TYPE_PATTERN = re.compile(r'^\s*(\w+(?:Error|Exception|Warning|Exit|Interrupt))\b', re.MULTILINE)
+
+def parse_error_type(error_log):
+    """
+    Extracts the exception class name (e.g. 'NameError') from a traceback or
+    error message. The last match wins since tracebacks end with the raised error.
+    Returns an empty string when no exception name is found.
+    """
+    if not error_log:
+        return ''
+    matches = ERROR_TYPE_PATTERN.findall(error_log)
+    return matches[-1] if matches else ''
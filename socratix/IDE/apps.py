@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class IdeConfig(AppConfig):
     name = 'IDE'
+
+    def ready(self):
+        # Registers the problem cache invalidation signals
+        from . import problems  # noqa: F401
@@ -0,0 +1,33 @@
+import hashlib
+import zlib
+
+from django.conf import settings
+
+
+def digest_text(text):
+    """
+    Returns the SHA-256 hex digest used as the content key for a blob.
+    """
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def pack_text(text):
+    """
+    Encodes text for storage, zlib-compressing it when enabled and worthwhile.
+    Returns a (data, compressed) tuple.
+    """
+    raw = text.encode('utf-8')
+    if getattr(settings, 'BLOB_COMPRESSION', True) and len(raw) >= getattr(settings, 'BLOB_COMPRESS_MIN_SIZE', 128):
+        packed = zlib.compress(raw, getattr(settings, 'BLOB_COMPRESSION_LEVEL', 6))
+        # Only keep the compressed form if it actually saves space
+        if len(packed) < len(raw):
+            return packed, True
+    return raw, False
+
+
+def unpack_text(data, compressed):
+    """Inverse of pack_text."""
+    data = bytes(data)
+    if compressed:
+        data = zlib.decompress(data)
+    return data.decode('utf-8')
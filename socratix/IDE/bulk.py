@@ -0,0 +1,68 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from . import llm
+
+
+def _result(item, hint, usage, error, latency_ms):
+    return {
+        'id': item.get('id'),
+        'provider': llm.LLM_PROVIDER,
+        'latency_ms': latency_ms,
+        'prompt_tokens': usage.get('prompt_tokens'),
+        'completion_tokens': usage.get('completion_tokens'),
+        'hint': hint.get('hint', ''),
+        'analogy': hint.get('analogy', ''),
+        'concept': hint.get('concept', ''),
+        'line_no': hint.get('line_no', 0),
+        'error': error,
+    }
+
+
+def _hint_one(item, deadline=None):
+    if deadline is not None and time.monotonic() >= deadline:
+        return _result(item, {}, {}, 'Time budget exceeded; not attempted', 0.0)
+    start = time.perf_counter()
+    error = None
+    try:
+        hint, usage = llm.request_hint(
+            item.get('code', ''), item.get('error', ''), item.get('problem_description', '')
+        )
+    except Exception as e:
+        # Reported per item so a resumed run can retry it
+        hint, usage, error = {}, {}, str(e) or e.__class__.__name__
+    return _result(item, hint, usage, error, round((time.perf_counter() - start) * 1000, 1))
+
+
+def run_bulk(items, max_workers=4, time_budget=None):
+    """
+    Runs generate_hint over an iterable of {'id', 'code', 'error',
+    'problem_description'} dicts on a bounded thread pool and yields one
+    result dict per item as it completes (not in input order). Failed items
+    have their message in 'error' and are not retried here.
+
+    At most 2 * max_workers items are in flight, so `items` can be a lazy
+    iterator over thousands of rows.
+
+    With a time_budget (seconds), items not yet started when it runs out are
+    not sent to the provider; they are yielded with an 'error' so the caller
+    can resubmit them.
+    """
+    max_workers = max(1, max_workers)
+    items = iter(items)
+    deadline = time.monotonic() + time_budget if time_budget is not None else None
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='rehint') as executor:
+        pending = set()
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < max_workers * 2:
+                item = next(items, None)
+                if item is None:
+                    exhausted = True
+                else:
+                    pending.add(executor.submit(_hint_one, item, deadline))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
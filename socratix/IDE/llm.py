@@ -3,9 +3,13 @@ import logging
 import json
 import urllib3
 
+from . import replay
+
 logger = logging.getLogger(__name__)
 
 LLM_PROVIDER = getattr(settings, 'LLM_PROVIDER', 'groq').lower()
+GEMINI_MODEL = 'gemini-2.0-flash'
+GROQ_MODEL = 'llama-3.3-70b-versatile'
 
 # Client Initialization
 client_gemini = None
@@ -70,6 +74,10 @@ Note: `line_no` should be the integer line number of the error, or 0 if general/
 Do not include anything outside this JSON.
 """
 
+class ProviderUnavailable(Exception):
+    """The configured provider has no client (missing API key or library)."""
+
+
 def _build_prompt(code, error, problem_description=""):
     return f"""
     {SYSTEM_PROMPT}
@@ -90,21 +98,21 @@ def _build_prompt(code, error, problem_description=""):
 
 def _generate_hint_gemini(code, error, problem_description=""):
     if not client_gemini:
-        return {
-            "analogy": "I am currently offline (API Key missing).",
-            "hint": "Please check your configuration.",
-            "concept": "System Error"
-        }
+        raise ProviderUnavailable("I am currently offline (API Key missing).")
 
     prompt = _build_prompt(code, error, problem_description)
     response = client_gemini.models.generate_content(
-        model='gemini-2.0-flash',
+        model=GEMINI_MODEL,
         contents=prompt,
         config=types.GenerateContentConfig(
             response_mime_type='application/json'
         )
     )
-    return json.loads(response.text)
+    usage = getattr(response, 'usage_metadata', None)
+    return json.loads(response.text), {
+        'prompt_tokens': getattr(usage, 'prompt_token_count', None),
+        'completion_tokens': getattr(usage, 'candidates_token_count', None),
+    }
 
 
 def _generate_hint_ollama(code, error, problem_description=""):
@@ -138,7 +146,10 @@ def _generate_hint_ollama(code, error, problem_description=""):
         body = response.data.decode("utf-8")
         data = json.loads(body)
         response_text = data.get("response", "")
-        return json.loads(response_text)
+        return json.loads(response_text), {
+            'prompt_tokens': data.get('prompt_eval_count'),
+            'completion_tokens': data.get('eval_count'),
+        }
         
     except Exception as e:
         logger.error(f"Ollama Connection Error: {e}")
@@ -146,17 +157,13 @@ def _generate_hint_ollama(code, error, problem_description=""):
 
 def _generate_hint_groq(code, error, problem_description=""):
     if not client_groq:
-        return {
-            "analogy": "I am currently offline (Groq API Key missing).",
-            "hint": "Please check your configuration.",
-            "concept": "System Error"
-        }
+        raise ProviderUnavailable("I am currently offline (Groq API Key missing).")
         
     prompt = _build_prompt(code, error, problem_description)
     
     try:
         completion = client_groq.chat.completions.create(
-            model="llama-3.3-70b-versatile",
+            model=GROQ_MODEL,
             messages=[
                 {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": prompt}
@@ -169,24 +176,59 @@ def _generate_hint_groq(code, error, problem_description=""):
         )
         
         content = completion.choices[0].message.content
-        return json.loads(content)
+        usage = getattr(completion, 'usage', None)
+        return json.loads(content), {
+            'prompt_tokens': getattr(usage, 'prompt_tokens', None),
+            'completion_tokens': getattr(usage, 'completion_tokens', None),
+        }
         
     except Exception as e:
         logger.error(f"Groq API Error: {e}")
         raise e
 
 
-def generate_hint(code, error, problem_description=""):
+def request_hint(code, error, problem_description=""):
     """
-    Generates a Socratic hint using the configured LLM provider.
+    Calls the configured provider and returns (hint, usage), where usage holds
+    the provider-reported prompt_tokens and completion_tokens (None if unknown).
+    Unlike generate_hint, provider errors are raised rather than turned into a
+    fallback hint.
+    """
+    if LLM_PROVIDER == 'ollama':
+        provider_fn = _generate_hint_ollama
+        model = getattr(settings, 'OLLAMA_MODEL', 'llama3')
+    elif LLM_PROVIDER == 'groq':
+        provider_fn = _generate_hint_groq
+        model = GROQ_MODEL
+    else: # Default to gemini
+        provider_fn = _generate_hint_gemini
+        model = GEMINI_MODEL
+
+    # Record/replay sits at the provider boundary (see replay.py)
+    return replay.call(
+        LLM_PROVIDER, model, _build_prompt(code, error, problem_description),
+        lambda: provider_fn(code, error, problem_description)
+    )
+
+
+def generate_hint_with_usage(code, error, problem_description=""):
+    """
+    Like generate_hint, but returns a (hint, usage) tuple (see request_hint).
+    A replay cassette miss is raised rather than turned into a fallback hint,
+    so offline load tests fail loudly instead of reporting fast junk hints.
     """
     try:
-        if LLM_PROVIDER == 'ollama':
-            return _generate_hint_ollama(code, error, problem_description)
-        elif LLM_PROVIDER == 'groq':
-            return _generate_hint_groq(code, error, problem_description)
-        else: # Default to gemini
-             return _generate_hint_gemini(code, error, problem_description)
+        return request_hint(code, error, problem_description)
+
+    except replay.ReplayMiss:
+        raise
+
+    except ProviderUnavailable as e:
+        return {
+            "analogy": str(e),
+            "hint": "Please check your configuration.",
+            "concept": "System Error"
+        }, {}
 
     except Exception as e:
         logger.error(f"LLM Error: {e}")
@@ -194,4 +236,12 @@ def generate_hint(code, error, problem_description=""):
             "analogy": "I'm having trouble thinking clearly right now.",
             "hint": f"It seems there's a system error: {str(e)}",
             "concept": "System Error: " + str(e)
-        }
+        }, {}
+
+
+def generate_hint(code, error, problem_description=""):
+    """
+    Generates a Socratic hint using the configured LLM provider.
+    """
+    hint, usage = generate_hint_with_usage(code, error, problem_description)
+    return hint
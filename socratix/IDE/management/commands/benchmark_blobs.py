@@ -0,0 +1,189 @@
+import random
+import time
+
+from django.apps.registry import Apps
+from django.core.management.base import BaseCommand
+from django.db import connection, models, transaction
+
+from IDE.models import BlobManager, Interaction
+from IDE.blobs import unpack_text
+
+STARTER_CODE = '\n'.join([
+    'def main():',
+    '    print("Hello Everyone!")',
+    '    for i in range(5):',
+    '        print("Counting:", i)',
+    '',
+    'if __name__ == "__main__":',
+    '    main()',
+])
+
+ERRORS = [
+    'Traceback (most recent call last):\n  File "<exec>", line 4, in main\nNameError: name \'i\' is not defined',
+    '  File "<exec>", line 2\n    print("Hello Everyone!"\n         ^\nSyntaxError: \'(\' was never closed',
+    'TimeoutError: Infinite Loop Detected',
+]
+
+HINTS = [
+    'Imagine a recipe that calls for an ingredient you never bought. Where did you introduce this name?',
+    'A sentence without a full stop leaves the reader waiting. What does Python expect after an opening bracket?',
+    'A treadmill never reaches the door. What changes on each pass of your loop?',
+]
+
+# Scratch copies of the old and new schemas, kept out of the project's app
+# registry so they never show up in migrations.
+bench_apps = Apps()
+
+
+class InlineInteraction(models.Model):
+    """Interaction as it was before blobs: text stored inline"""
+    user_code = models.TextField()
+    error_log = models.TextField(blank=True, null=True)
+    ai_hint = models.TextField(blank=True, null=True)
+    timestamp = models.DateTimeField(auto_now_add=True)
+    session_id = models.CharField(max_length=100, blank=True, null=True)
+
+    class Meta:
+        apps = bench_apps
+        app_label = 'IDE'
+        db_table = 'IDE_bench_inline_interaction'
+
+
+class BenchBlob(models.Model):
+    digest = models.CharField(max_length=64, unique=True)
+    data = models.BinaryField()
+    compressed = models.BooleanField(default=False)
+    size = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = BlobManager()
+
+    class Meta:
+        apps = bench_apps
+        app_label = 'IDE'
+        db_table = 'IDE_bench_blob'
+
+
+class BlobInteraction(models.Model):
+    code_blob = models.ForeignKey(BenchBlob, on_delete=models.PROTECT, related_name='+', blank=True, null=True)
+    error_blob = models.ForeignKey(BenchBlob, on_delete=models.PROTECT, related_name='+', blank=True, null=True)
+    hint_blob = models.ForeignKey(BenchBlob, on_delete=models.PROTECT, related_name='+', blank=True, null=True)
+    timestamp = models.DateTimeField(auto_now_add=True)
+    session_id = models.CharField(max_length=100, blank=True, null=True)
+
+    class Meta:
+        apps = bench_apps
+        app_label = 'IDE'
+        db_table = 'IDE_bench_blob_interaction'
+
+
+BENCH_MODELS = [InlineInteraction, BenchBlob, BlobInteraction]
+
+
+def _text(blob):
+    return unpack_text(blob.data, blob.compressed) if blob else ''
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare on-disk table size and ORM insert throughput of inline text columns "
+        "against deduplicated blobs, using scratch tables that are dropped afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def _workload(self, rows, seed):
+        """Use real interactions when there are enough, otherwise a synthetic classroom."""
+        existing = list(
+            Interaction.objects.select_related('code_blob', 'error_blob', 'hint_blob')
+            .order_by('-pk')[:rows]
+        )
+        if len(existing) >= rows:
+            return [(_text(i.code_blob), _text(i.error_blob), _text(i.hint_blob)) for i in existing]
+
+        rng = random.Random(seed)
+        workload = []
+        for n in range(rows):
+            code = STARTER_CODE
+            # Most students submit the starter code or a single-line edit of it
+            if rng.random() < 0.4:
+                code = code.replace('range(5)', f'range({rng.randint(1, 20)})')
+            workload.append((code, rng.choice(ERRORS), rng.choice(HINTS)))
+        return workload
+
+    def _table_size(self, model):
+        """Bytes used by the model's table and its indexes, or None if the backend can't say."""
+        table = model._meta.db_table
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SELECT pg_total_relation_size(%s)', [table])
+                return cursor.fetchone()[0]
+            if connection.vendor == 'sqlite':
+                try:
+                    cursor.execute(
+                        'SELECT SUM(pgsize) FROM dbstat WHERE name IN '
+                        '(SELECT name FROM sqlite_master WHERE tbl_name = %s)',
+                        [table]
+                    )
+                except Exception:
+                    # SQLite built without SQLITE_ENABLE_DBSTAT_VTAB
+                    return None
+                return cursor.fetchone()[0] or 0
+        return None
+
+    def _bench_inline(self, workload):
+        start = time.perf_counter()
+        with transaction.atomic():
+            for code, error, hint in workload:
+                InlineInteraction.objects.create(
+                    user_code=code, error_log=error or None, ai_hint=hint or None, session_id='benchmark'
+                )
+        return time.perf_counter() - start
+
+    def _bench_blobs(self, workload):
+        start = time.perf_counter()
+        with transaction.atomic():
+            for code, error, hint in workload:
+                BlobInteraction.objects.create(
+                    code_blob=BenchBlob.objects.for_text(code),
+                    error_blob=BenchBlob.objects.for_text(error),
+                    hint_blob=BenchBlob.objects.for_text(hint),
+                    session_id='benchmark'
+                )
+        return time.perf_counter() - start
+
+    def _format_size(self, size):
+        return 'n/a' if size is None else f'{size} bytes'
+
+    def handle(self, *args, **options):
+        workload = self._workload(options['rows'], options['seed'])
+        rows = len(workload)
+
+        with connection.schema_editor() as schema_editor:
+            for model in BENCH_MODELS:
+                schema_editor.create_model(model)
+        try:
+            inline_time = self._bench_inline(workload)
+            blob_time = self._bench_blobs(workload)
+            inline_size = self._table_size(InlineInteraction)
+            interaction_size = self._table_size(BlobInteraction)
+            blob_size = self._table_size(BenchBlob)
+            blob_count = BenchBlob.objects.count()
+        finally:
+            with connection.schema_editor() as schema_editor:
+                for model in reversed(BENCH_MODELS):
+                    schema_editor.delete_model(model)
+
+        self.stdout.write(f"Rows: {rows} ({connection.vendor})")
+        self.stdout.write(
+            f"Inline text: table {self._format_size(inline_size)}, {rows / inline_time:.0f} inserts/s"
+        )
+        self.stdout.write(
+            f"Blobs:       interactions {self._format_size(interaction_size)} + "
+            f"{blob_count} blobs {self._format_size(blob_size)}, {rows / blob_time:.0f} inserts/s"
+        )
+        if inline_size and interaction_size is not None and blob_size is not None:
+            total = interaction_size + blob_size
+            self.stdout.write(f"Total size: {100 * total / inline_size:.1f}% of inline")
@@ -0,0 +1,67 @@
+import io
+import json
+import pstats
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Aggregate profiles captured by ProfilingMiddleware and print the top hot spots."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', default=getattr(settings, 'PROFILING_DIR', 'profiles'))
+        parser.add_argument('--top', type=int, default=25, help="Number of functions to list.")
+        parser.add_argument(
+            '--sort', default='cumulative', choices=['cumulative', 'tottime', 'ncalls'],
+            help="Stat to rank functions by."
+        )
+        parser.add_argument('--path', default=None, help="Only include requests whose path starts with this.")
+
+    def _load(self, directory, path_prefix):
+        profiles = []
+        for prof in sorted(directory.glob('*.prof')):
+            meta_path = prof.with_suffix('.json')
+            try:
+                meta = json.loads(meta_path.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                meta = {}
+            if path_prefix and not meta.get('path', '').startswith(path_prefix):
+                continue
+            profiles.append((prof, meta))
+        return profiles
+
+    def handle(self, *args, **options):
+        directory = Path(options['dir'])
+        if not directory.is_dir():
+            raise CommandError(f"No profile directory at {directory}")
+
+        profiles = self._load(directory, options['path'])
+        if not profiles:
+            self.stdout.write("No profiles found.")
+            return
+
+        # Per-endpoint request time and peak memory
+        by_path = defaultdict(list)
+        for prof, meta in profiles:
+            by_path[meta.get('path', '?')].append(meta)
+        self.stdout.write(f"{len(profiles)} profiled requests\n")
+        self.stdout.write(f"{'path':<40} {'count':>6} {'mean ms':>10} {'max ms':>10} {'max peak KiB':>14}")
+        for path, metas in sorted(by_path.items()):
+            durations = [m['duration_ms'] for m in metas if 'duration_ms' in m]
+            peaks = [m['peak_memory_bytes'] for m in metas if m.get('peak_memory_bytes') is not None]
+            mean_ms = sum(durations) / len(durations) if durations else 0
+            self.stdout.write(
+                f"{path:<40} {len(metas):>6} {mean_ms:>10.1f} {max(durations, default=0):>10.1f} "
+                f"{max(peaks, default=0) / 1024:>14.1f}"
+            )
+
+        # Function-level hot spots summed over all requests
+        output = io.StringIO()
+        stats = pstats.Stats(str(profiles[0][0]), stream=output)
+        for prof, meta in profiles[1:]:
+            stats.add(str(prof))
+        stats.strip_dirs().sort_stats(options['sort']).print_stats(options['top'])
+        self.stdout.write(output.getvalue())
@@ -0,0 +1,88 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand
+
+from IDE import bulk, llm
+from IDE.models import Interaction
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-generate hints for historical interactions with the configured LLM provider "
+        "and stream the results to a JSONL file. Re-running with the same output file "
+        "resumes where the previous run stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help="JSONL results file; also the resume checkpoint.")
+        parser.add_argument('--workers', type=int, default=4, help="Concurrent LLM requests.")
+        parser.add_argument('--limit', type=int, default=None, help="Maximum interactions to re-hint in this run.")
+        parser.add_argument('--session', default=None, help="Only re-hint interactions from this session.")
+
+    def _completed_ids(self, path):
+        done = set()
+        if not os.path.exists(path):
+            return done
+        with open(path, encoding='utf-8') as results:
+            for line in results:
+                try:
+                    result = json.loads(line)
+                except ValueError:
+                    # A run killed mid-write can leave a truncated last line
+                    continue
+                # Failed items (rate limits, outages) are retried on resume
+                if isinstance(result, dict) and 'id' in result and not result.get('error'):
+                    done.add(result['id'])
+        return done
+
+    def _items(self, queryset, done, limit):
+        yielded = 0
+        for interaction in queryset.iterator(chunk_size=200):
+            if interaction.pk in done:
+                continue
+            if limit is not None and yielded >= limit:
+                return
+            yielded += 1
+            yield {
+                'id': interaction.pk,
+                'code': interaction.user_code,
+                'error': interaction.error_log or '',
+            }
+
+    def handle(self, *args, **options):
+        path = options['output']
+        done = self._completed_ids(path)
+        if done:
+            self.stdout.write(f"Resuming: {len(done)} interactions already in {path}")
+
+        queryset = Interaction.objects.select_related('code_blob', 'error_blob').order_by('pk')
+        if options['session']:
+            queryset = queryset.filter(session_id=options['session'])
+
+        items = self._items(queryset, done, options['limit'])
+        count = 0
+        failed = 0
+        total_latency = 0.0
+        with open(path, 'a', encoding='utf-8') as results:
+            for result in bulk.run_bulk(items, max_workers=options['workers']):
+                results.write(json.dumps(result) + '\n')
+                # Flush per line so the file is an up-to-date checkpoint
+                results.flush()
+                count += 1
+                failed += bool(result['error'])
+                total_latency += result['latency_ms']
+                if count % 50 == 0:
+                    self.stdout.write(f"{count} re-hinted...")
+
+        if count:
+            self.stdout.write(self.style.SUCCESS(
+                f"Re-hinted {count} interactions with {llm.LLM_PROVIDER}, "
+                f"mean latency {total_latency / count:.0f} ms"
+            ))
+            if failed:
+                self.stdout.write(self.style.WARNING(
+                    f"{failed} failed; run again with the same output file to retry them."
+                ))
+        else:
+            self.stdout.write("Nothing to re-hint.")
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from IDE import rollups
+from IDE.models import Rollup
+
+
+class Command(BaseCommand):
+    help = "Rebuild the analytics rollups (concept, error type, hour, session) from all interactions."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--if-empty', action='store_true',
+            help="Only rebuild when there are no rollups yet (e.g. right after the migration that adds them)."
+        )
+
+    def handle(self, *args, **options):
+        if options['if_empty'] and Rollup.objects.exists():
+            self.stdout.write("Rollups already populated; nothing to do.")
+            return
+        written = rollups.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} rollups."))
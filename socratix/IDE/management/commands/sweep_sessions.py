@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from IDE.models import StudentSession
+
+
+class Command(BaseCommand):
+    help = "Delete student sessions with no activity for a number of days."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=getattr(settings, 'SESSION_RETENTION_DAYS', 90),
+            help="Delete sessions idle for longer than this."
+        )
+        parser.add_argument(
+            '--keep-scored', action='store_true',
+            help="Only delete sessions that never solved a problem."
+        )
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        stale = StudentSession.objects.filter(last_activity__lt=cutoff)
+        if options['keep_scored']:
+            stale = stale.filter(problems_solved=0)
+
+        if options['dry_run']:
+            self.stdout.write(f"Would delete {stale.count()} sessions idle since before {cutoff:%Y-%m-%d}.")
+            return
+
+        deleted, _ = stale.delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} sessions idle since before {cutoff:%Y-%m-%d}."))
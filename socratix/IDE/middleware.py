@@ -0,0 +1,166 @@
+import cProfile
+import hmac
+import itertools
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+re_accepts_brotli = re.compile(r"\bbr\b")
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Brotli-compresses HTML and JSON responses for clients that accept it and
+    falls back to Django's gzip handling otherwise (or when brotli is not
+    installed). Streaming responses always use gzip, which Django compresses
+    chunk by chunk.
+
+    Place it after WhiteNoiseMiddleware: WhiteNoise answers static requests
+    itself with its precompressed files, so they never reach this middleware.
+    """
+
+    def process_response(self, request, response):
+        if (
+            brotli is None
+            or response.streaming
+            or len(response.content) < 200
+            or response.has_header("Content-Encoding")
+            or not re_accepts_brotli.search(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        ):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        compressed_content = brotli.compress(response.content, quality=5)
+        if len(compressed_content) >= len(response.content):
+            return response
+        response.content = compressed_content
+        response.headers["Content-Length"] = str(len(response.content))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = "br"
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Captures cProfile stats and tracemalloc peak memory for selected requests
+    and writes them to PROFILING_DIR (see `manage.py profile_report`).
+
+    A request is profiled when its path starts with one of PROFILING_PATHS and
+    it either sends PROFILING_SECRET in the PROFILING_HEADER header or falls in
+    the PROFILING_SAMPLE_RATE sample. The header is ignored while
+    PROFILING_SECRET is empty. Only one request is profiled at a time, since
+    both profilers are process-wide. When PROFILING_ENABLED is off the
+    middleware removes itself at startup, so it costs nothing.
+
+    Put it first in MIDDLEWARE so the other middleware is included in the profile.
+    cProfile only sees the request thread; set HINT_PIPELINE_CONCURRENT off to
+    profile the LLM client calls as well.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.paths = tuple(getattr(settings, 'PROFILING_PATHS', ['/api/hint/']))
+        self.sample_rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0.0)
+        self.header = getattr(settings, 'PROFILING_HEADER', 'X-Profile')
+        self.secret = getattr(settings, 'PROFILING_SECRET', '')
+        self.directory = Path(getattr(settings, 'PROFILING_DIR', 'profiles'))
+        self.max_files = getattr(settings, 'PROFILING_MAX_FILES', 500)
+        self.trace_memory = getattr(settings, 'PROFILING_TRACEMALLOC', True)
+        self._busy = threading.Lock()
+        self._counter = itertools.count()
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            # A diagnostic tool must not stop the site from starting
+            logger.error(f"Profiling disabled, cannot create {self.directory}: {e}")
+            raise MiddlewareNotUsed
+
+    def _wants_profile(self, request):
+        if not request.path.startswith(self.paths):
+            return False
+        supplied = request.headers.get(self.header) if self.header else None
+        if self.secret and supplied and hmac.compare_digest(supplied.encode(), self.secret.encode()):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if not self._wants_profile(request) or not self._busy.acquire(blocking=False):
+            return self.get_response(request)
+        try:
+            return self._profile(request)
+        finally:
+            self._busy.release()
+
+    def _profile(self, request):
+        started_tracing = False
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler (e.g. a debugger) is already active
+            profiler = None
+        try:
+            response = self.get_response(request)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            duration_ms = (time.perf_counter() - start) * 1000
+            peak = tracemalloc.get_traced_memory()[1] if self.trace_memory else None
+            if started_tracing:
+                tracemalloc.stop()
+
+        if profiler is not None:
+            self._save(request, response, profiler, duration_ms, peak)
+        return response
+
+    def _save(self, request, response, profiler, duration_ms, peak):
+        name = f'{time.strftime("%Y%m%dT%H%M%S")}_{os.getpid()}_{next(self._counter)}'
+        try:
+            profiler.dump_stats(self.directory / f'{name}.prof')
+            with open(self.directory / f'{name}.json', 'w', encoding='utf-8') as meta:
+                json.dump({
+                    'path': request.path,
+                    'method': request.method,
+                    'status': response.status_code,
+                    'duration_ms': round(duration_ms, 2),
+                    'peak_memory_bytes': peak,
+                }, meta)
+            self._rotate()
+        except OSError as e:
+            logger.error(f"Could not write profile {name}: {e}")
+
+    def _rotate(self):
+        profiles = sorted(self.directory.glob('*.prof'), key=lambda p: p.stat().st_mtime)
+        for old in profiles[:max(len(profiles) - self.max_files, 0)]:
+            old.unlink(missing_ok=True)
+            old.with_suffix('.json').unlink(missing_ok=True)
@@ -0,0 +1,44 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('IDE', '0006_studentsession_interaction_resolved_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Blob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(max_length=64, unique=True)),
+                ('data', models.BinaryField()),
+                ('compressed', models.BooleanField(default=False)),
+                ('size', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='interaction',
+            name='code_blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='IDE.blob'),
+        ),
+        migrations.AddField(
+            model_name='interaction',
+            name='error_blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='IDE.blob'),
+        ),
+        migrations.AddField(
+            model_name='interaction',
+            name='hint_blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='IDE.blob'),
+        ),
+        # Relax user_code first so the reverse migration can re-add it on a populated table
+        migrations.AlterField(
+            model_name='interaction',
+            name='user_code',
+            field=models.TextField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,80 @@
+import hashlib
+import zlib
+
+from django.db import migrations
+
+# Frozen copies of IDE.blobs as of this migration, so later changes to the
+# helpers or the BLOB_* settings don't change what it writes.
+COMPRESS_MIN_SIZE = 128
+COMPRESSION_LEVEL = 6
+
+
+def digest_text(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def pack_text(text):
+    raw = text.encode('utf-8')
+    if len(raw) >= COMPRESS_MIN_SIZE:
+        packed = zlib.compress(raw, COMPRESSION_LEVEL)
+        if len(packed) < len(raw):
+            return packed, True
+    return raw, False
+
+
+def unpack_text(data, compressed):
+    data = bytes(data)
+    if compressed:
+        data = zlib.decompress(data)
+    return data.decode('utf-8')
+
+
+def _blob_for(Blob, text, cache):
+    if not text:
+        return None
+    digest = digest_text(text)
+    if digest not in cache:
+        data, compressed = pack_text(text)
+        cache[digest], created = Blob.objects.get_or_create(
+            digest=digest,
+            defaults={'data': data, 'compressed': compressed, 'size': len(text)}
+        )
+    return cache[digest]
+
+
+def move_text_to_blobs(apps, schema_editor):
+    Blob = apps.get_model('IDE', 'Blob')
+    Interaction = apps.get_model('IDE', 'Interaction')
+    cache = {}
+    for interaction in Interaction.objects.order_by('pk').iterator(chunk_size=500):
+        interaction.code_blob = _blob_for(Blob, interaction.user_code, cache)
+        interaction.error_blob = _blob_for(Blob, interaction.error_log, cache)
+        interaction.hint_blob = _blob_for(Blob, interaction.ai_hint, cache)
+        interaction.save(update_fields=['code_blob', 'error_blob', 'hint_blob'])
+
+
+def move_blobs_to_text(apps, schema_editor):
+    Interaction = apps.get_model('IDE', 'Interaction')
+    queryset = Interaction.objects.select_related('code_blob', 'error_blob', 'hint_blob')
+    for interaction in queryset.order_by('pk').iterator(chunk_size=500):
+        blob = interaction.code_blob
+        interaction.user_code = unpack_text(blob.data, blob.compressed) if blob else ''
+        blob = interaction.error_blob
+        interaction.error_log = unpack_text(blob.data, blob.compressed) if blob else None
+        blob = interaction.hint_blob
+        interaction.ai_hint = unpack_text(blob.data, blob.compressed) if blob else None
+        interaction.save(update_fields=['user_code', 'error_log', 'ai_hint'])
+
+
+class Migration(migrations.Migration):
+    # The data copy has its own migration (and so its own transaction on
+    # PostgreSQL): the new foreign keys are DEFERRABLE INITIALLY DEFERRED, and
+    # altering the table while the row updates' trigger events are pending fails.
+
+    dependencies = [
+        ('IDE', '0007_blob_interaction_blobs'),
+    ]
+
+    operations = [
+        migrations.RunPython(move_text_to_blobs, move_blobs_to_text),
+    ]
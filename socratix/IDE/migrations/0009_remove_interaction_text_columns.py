@@ -0,0 +1,23 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('IDE', '0008_move_interaction_text_to_blobs'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='interaction',
+            name='user_code',
+        ),
+        migrations.RemoveField(
+            model_name='interaction',
+            name='error_log',
+        ),
+        migrations.RemoveField(
+            model_name='interaction',
+            name='ai_hint',
+        ),
+    ]
@@ -0,0 +1,74 @@
+import re
+import zlib
+
+from django.db import migrations, models
+
+# Frozen copies of IDE.analysis.parse_error_type and IDE.blobs.unpack_text as
+# of this migration, so later changes to them don't change the backfill.
+ERROR_TYPE_PATTERN = re.compile(r'^\s*(\w+(?:Error|Exception|Warning|Exit|Interrupt))\b', re.MULTILINE)
+
+
+def parse_error_type(error_log):
+    matches = ERROR_TYPE_PATTERN.findall(error_log or '')
+    return matches[-1] if matches else ''
+
+
+def unpack_text(data, compressed):
+    data = bytes(data)
+    if compressed:
+        data = zlib.decompress(data)
+    return data.decode('utf-8')
+
+
+def backfill_error_type(apps, schema_editor):
+    Interaction = apps.get_model('IDE', 'Interaction')
+    queryset = Interaction.objects.filter(error_blob__isnull=False).select_related('error_blob')
+    for interaction in queryset.order_by('pk').iterator(chunk_size=500):
+        blob = interaction.error_blob
+        error_type = parse_error_type(unpack_text(blob.data, blob.compressed))[:100]
+        if error_type:
+            interaction.error_type = error_type
+            interaction.save(update_fields=['error_type'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('IDE', '0009_remove_interaction_text_columns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='interaction',
+            name='concept',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='interaction',
+            name='error_type',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='interaction',
+            name='line_no',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='Rollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('concept', 'Concept'), ('error_type', 'Error type'), ('hour', 'Hour'), ('session', 'Session')], max_length=20)),
+                ('key', models.CharField(max_length=100)),
+                ('interactions', models.IntegerField(default=0)),
+                ('resolved', models.IntegerField(default=0)),
+                ('resolve_seconds_total', models.FloatField(default=0)),
+                ('resolve_histogram', models.JSONField(default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['dimension', '-interactions'], name='rollup_dimension_top')],
+                'constraints': [models.UniqueConstraint(fields=('dimension', 'key'), name='unique_rollup_dimension_key')],
+            },
+        ),
+        migrations.RunPython(backfill_error_type, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.utils import timezone
+from .blobs import digest_text, pack_text, unpack_text
 
 class Problem(models.Model):
     title = models.CharField(max_length=200)
@@ -20,10 +21,42 @@ class StudentSession(models.Model):
     def __str__(self):
         return f"Session {self.session_id} - Score: {self.total_score}"
 
+class BlobManager(models.Manager):
+    def for_text(self, text):
+        """Get-or-create the blob holding `text`. Empty text maps to None."""
+        if not text:
+            return None
+        digest = digest_text(text)
+        blob = self.filter(digest=digest).first()
+        if blob is None:
+            data, compressed = pack_text(text)
+            blob, created = self.get_or_create(
+                digest=digest,
+                defaults={'data': data, 'compressed': compressed, 'size': len(text)}
+            )
+        return blob
+
+class Blob(models.Model):
+    """Content-addressed storage for code, error and hint text, keyed by SHA-256"""
+    digest = models.CharField(max_length=64, unique=True)
+    data = models.BinaryField()
+    compressed = models.BooleanField(default=False)
+    size = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = BlobManager()
+
+    @property
+    def text(self):
+        return unpack_text(self.data, self.compressed)
+
+    def __str__(self):
+        return f"Blob {self.digest[:12]} ({self.size} chars)"
+
 class Interaction(models.Model):
-    user_code = models.TextField()
-    error_log = models.TextField(blank=True, null=True)
-    ai_hint = models.TextField(blank=True, null=True)
+    code_blob = models.ForeignKey(Blob, on_delete=models.PROTECT, related_name='+', blank=True, null=True)
+    error_blob = models.ForeignKey(Blob, on_delete=models.PROTECT, related_name='+', blank=True, null=True)
+    hint_blob = models.ForeignKey(Blob, on_delete=models.PROTECT, related_name='+', blank=True, null=True)
     timestamp = models.DateTimeField(auto_now_add=True)
     
     # New fields for score tracking
@@ -31,6 +64,52 @@ class Interaction(models.Model):
     was_resolved = models.BooleanField(default=False)
     resolved_at = models.DateTimeField(blank=True, null=True)
 
+    # Structured hint metadata used by the analytics rollups
+    concept = models.CharField(max_length=100, blank=True, default='')
+    error_type = models.CharField(max_length=100, blank=True, default='')
+    line_no = models.IntegerField(default=0)
+
+    @property
+    def user_code(self):
+        return self.code_blob.text if self.code_blob_id else ''
+
+    @property
+    def error_log(self):
+        return self.error_blob.text if self.error_blob_id else None
+
+    @property
+    def ai_hint(self):
+        return self.hint_blob.text if self.hint_blob_id else None
+
     def __str__(self):
         return f"Interaction at {self.timestamp}"
 
+
+class Rollup(models.Model):
+    """Precomputed interaction counts and resolution times for one concept, error type, hour or session"""
+    DIMENSION_CHOICES = [
+        ('concept', 'Concept'),
+        ('error_type', 'Error type'),
+        ('hour', 'Hour'),
+        ('session', 'Session'),
+    ]
+
+    dimension = models.CharField(max_length=20, choices=DIMENSION_CHOICES)
+    key = models.CharField(max_length=100)
+    interactions = models.IntegerField(default=0)
+    resolved = models.IntegerField(default=0)
+    resolve_seconds_total = models.FloatField(default=0)
+    # Resolve-time counts per bucket of rollups.RESOLVE_BUCKETS, used for the median
+    resolve_histogram = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['dimension', 'key'], name='unique_rollup_dimension_key'),
+        ]
+        indexes = [
+            models.Index(fields=['dimension', '-interactions'], name='rollup_dimension_top'),
+        ]
+
+    def __str__(self):
+        return f"{self.dimension}={self.key}: {self.interactions}"
@@ -0,0 +1,129 @@
+import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# Post-response task failures in this process, by task name
+_failures = Counter()
+_failures_lock = threading.Lock()
+
+
+def concurrent_enabled():
+    return getattr(settings, 'HINT_PIPELINE_CONCURRENT', True)
+
+
+def defer_enabled():
+    return getattr(settings, 'HINT_PIPELINE_DEFER_PERSIST', True)
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'HINT_PIPELINE_WORKERS', 8),
+                thread_name_prefix='hint-llm'
+            )
+        return _executor
+
+
+class StageTimer:
+    """Collects per-stage durations (ms) and renders them as a Server-Timing header"""
+
+    def __init__(self):
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name, seconds):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds * 1000
+
+    def header(self):
+        return ', '.join(f'{name};dur={ms:.1f}' for name, ms in self.stages.items())
+
+
+def start(fn, *args, **kwargs):
+    """
+    Starts fn on the pipeline executor and returns a Future. Falls back to
+    running it inline (and returning a completed Future) when the pipeline
+    is not concurrent, so callers can always call .result().
+    """
+    if concurrent_enabled():
+        return _get_executor().submit(fn, *args, **kwargs)
+
+    future = Future()
+    try:
+        future.set_result(fn(*args, **kwargs))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def failure_counts():
+    """Post-response task failures in this worker process since it started, by task name"""
+    with _failures_lock:
+        return dict(_failures)
+
+
+def _run_deferred(fn, args, kwargs):
+    name = getattr(fn, '__name__', repr(fn))
+    start = time.perf_counter()
+    try:
+        fn(*args, **kwargs)
+    except Exception:
+        with _failures_lock:
+            _failures[name] += 1
+            count = _failures[name]
+        logger.exception(f"Post-response task {name} failed ({count} failures in this worker)")
+    logger.debug(f"Post-response {name} took {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+class AfterResponseMixin:
+    """
+    Response mixin that runs registered callbacks from close(), which the WSGI
+    server calls on the request thread after writing the body. They run before
+    the base close() sends request_finished (which closes the DB connection),
+    so work stays in request order within a worker.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._after_response = []
+
+    def call_on_close(self, fn, *args, **kwargs):
+        self._after_response.append((fn, args, kwargs))
+
+    def close(self):
+        callbacks, self._after_response = self._after_response, []
+        try:
+            for fn, args, kwargs in callbacks:
+                _run_deferred(fn, args, kwargs)
+        finally:
+            super().close()
+
+
+def after_response(response, fn, *args, **kwargs):
+    """
+    Runs fn once `response` (an AfterResponseMixin response) has been sent,
+    or immediately when HINT_PIPELINE_DEFER_PERSIST is off. Failures of
+    deferred calls are logged and counted in failure_counts().
+    """
+    if defer_enabled():
+        response.call_on_close(fn, *args, **kwargs)
+    else:
+        fn(*args, **kwargs)
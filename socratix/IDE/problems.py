@@ -0,0 +1,108 @@
+import hashlib
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .analysis import analyze_structure
+from .models import Problem
+
+# problem id -> (expires_at, context); the catalog listing lives under None
+_cache = {}
+_lock = threading.Lock()
+
+
+def _ttl():
+    # Signals only reach this process, so entries also expire for other workers
+    return getattr(settings, 'PROBLEM_CACHE_TTL', 300)
+
+
+def _etag(payload):
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()[:32]
+
+
+def _build_context(problem):
+    public = {
+        'id': problem.pk,
+        'title': problem.title,
+        'description': problem.description,
+        'starter_code': problem.starter_code,
+    }
+    return {
+        'public': public,
+        'etag': _etag(public),
+        'starter_analysis': analyze_structure(problem.starter_code),
+    }
+
+
+def _build_catalog():
+    problems = [
+        {'id': pk, 'title': title}
+        for pk, title in Problem.objects.order_by('pk').values_list('pk', 'title')
+    ]
+    return {'public': {'problems': problems}, 'etag': _etag(problems)}
+
+
+def _cached(key, build):
+    now = time.monotonic()
+    with _lock:
+        entry = _cache.get(key)
+        if entry and entry[0] > now:
+            return entry[1]
+    value = build()
+    if value is not None:
+        with _lock:
+            _cache[key] = (now + _ttl(), value)
+    return value
+
+
+def get_problem_context(problem_id):
+    """
+    Returns the cached context for a problem: its public fields, an ETag and
+    the precomputed analyze_structure() of its starter code. None if missing.
+    """
+    try:
+        problem_id = int(problem_id)
+    except (TypeError, ValueError):
+        return None
+
+    def build():
+        problem = Problem.objects.filter(pk=problem_id).first()
+        return _build_context(problem) if problem else None
+
+    return _cached(problem_id, build)
+
+
+def get_catalog():
+    """Returns the cached problem listing and its ETag."""
+    return _cached(None, _build_catalog)
+
+
+def prompt_context(context):
+    """Problem description plus a summary of the starter code, for the hint prompt."""
+    if not context:
+        return ""
+    description = context['public']['description']
+    concepts = context['starter_analysis'].get('concepts_found', [])
+    if concepts:
+        description += "\nStarter code uses: " + ", ".join(dict.fromkeys(concepts))
+    return description
+
+
+def invalidate(problem_id=None):
+    with _lock:
+        if problem_id is not None:
+            _cache.pop(problem_id, None)
+        _cache.pop(None, None)
+
+
+@receiver(post_save, sender=Problem)
+@receiver(post_delete, sender=Problem)
+def _invalidate_problem(sender, instance, **kwargs):
+    # Wait for the commit, or a concurrent read could re-cache the old row
+    problem_id = instance.pk
+    transaction.on_commit(lambda: invalidate(problem_id))
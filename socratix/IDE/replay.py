@@ -0,0 +1,104 @@
+"""
+Record/replay of LLM provider calls.
+
+LLM_REPLAY_MODE = 'record' stores every provider response in a cassette
+directory keyed by a fingerprint of (provider, model, prompt); 'replay'
+serves them back without touching the network, optionally sleeping for the
+recorded latency. 'off' (the default) calls the provider directly.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ReplayMiss(LookupError):
+    """Raised in replay mode when no cassette matches the request."""
+
+
+def mode():
+    return getattr(settings, 'LLM_REPLAY_MODE', 'off').lower()
+
+
+def fingerprint(provider, model, prompt):
+    payload = json.dumps({'provider': provider, 'model': model, 'prompt': prompt}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _cassette_path(key):
+    root = getattr(settings, 'LLM_CASSETTE_DIR', 'llm_cassettes')
+    # Two-level fan-out keeps directories small on large recordings
+    return os.path.join(root, key[:2], f'{key}.json.gz')
+
+
+def load(key):
+    path = _cassette_path(key)
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as cassette:
+            return json.load(cassette)
+    except FileNotFoundError:
+        return None
+
+
+def save(key, entry):
+    path = _cassette_path(key)
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    # Write to a private temp file then rename, so concurrent recorders (threads
+    # or processes) never share or expose a half-written cassette
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as raw, gzip.open(raw, 'wt', encoding='utf-8') as cassette:
+            json.dump(entry, cassette, separators=(',', ':'))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def call(provider, model, prompt, fn):
+    """
+    Runs fn() -> (response, usage) through the recorder according to
+    LLM_REPLAY_MODE and returns (response, usage). Only successful calls are
+    recorded; if fn() raises (including a missing provider client) nothing
+    is stored.
+    """
+    current = mode()
+    if current not in ('record', 'replay'):
+        return fn()
+
+    key = fingerprint(provider, model, prompt)
+
+    if current == 'replay':
+        entry = load(key)
+        if entry is None:
+            raise ReplayMiss(f"No recorded {provider} response for fingerprint {key[:12]}")
+        if getattr(settings, 'LLM_REPLAY_SIMULATE_LATENCY', False):
+            time.sleep(entry.get('latency_ms', 0) / 1000)
+        return entry['response'], entry.get('usage', {})
+
+    start = time.perf_counter()
+    response, usage = fn()
+    latency_ms = round((time.perf_counter() - start) * 1000, 1)
+    try:
+        save(key, {
+            'provider': provider,
+            'model': model,
+            'response': response,
+            'usage': usage,
+            'latency_ms': latency_ms,
+            'recorded_at': time.time(),
+        })
+    except OSError as e:
+        logger.error(f"Could not record LLM cassette {key[:12]}: {e}")
+    return response, usage
@@ -0,0 +1,170 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Interaction, Rollup
+
+# Upper bounds (seconds) of the resolve-time histogram buckets. A final
+# overflow bucket catches anything slower than a day.
+RESOLVE_BUCKETS = [10, 30, 60, 120, 300, 600, 1800, 3600, 7200, 86400]
+
+
+def incremental_enabled():
+    return getattr(settings, 'ANALYTICS_INCREMENTAL', True)
+
+
+def interaction_keys(interaction):
+    """
+    Returns the (dimension, key) pairs an interaction counts towards.
+    Blank concepts, error types and sessions are skipped.
+    """
+    keys = []
+    if interaction.concept:
+        keys.append(('concept', interaction.concept))
+    if interaction.error_type:
+        keys.append(('error_type', interaction.error_type))
+    if interaction.timestamp:
+        keys.append(('hour', interaction.timestamp.strftime('%Y-%m-%dT%H')))
+    if interaction.session_id:
+        keys.append(('session', interaction.session_id[:100]))
+    return keys
+
+
+def _bucket_index(seconds):
+    for index, bound in enumerate(RESOLVE_BUCKETS):
+        if seconds <= bound:
+            return index
+    return len(RESOLVE_BUCKETS)
+
+
+def _empty_histogram():
+    return [0] * (len(RESOLVE_BUCKETS) + 1)
+
+
+def _resolve_seconds(interaction):
+    if not interaction.resolved_at or not interaction.timestamp:
+        return None
+    return max((interaction.resolved_at - interaction.timestamp).total_seconds(), 0.0)
+
+
+def record_interaction(interaction):
+    """Adds a newly created interaction to its rollups."""
+    for dimension, key in interaction_keys(interaction):
+        Rollup.objects.get_or_create(
+            dimension=dimension, key=key,
+            defaults={'resolve_histogram': _empty_histogram()}
+        )
+        Rollup.objects.filter(dimension=dimension, key=key).update(interactions=F('interactions') + 1)
+
+
+def record_resolution(interaction):
+    """Adds a just-resolved interaction's time-to-resolve to its rollups."""
+    seconds = _resolve_seconds(interaction)
+    if seconds is None:
+        return
+    bucket = _bucket_index(seconds)
+    with transaction.atomic():
+        for dimension, key in interaction_keys(interaction):
+            Rollup.objects.get_or_create(
+                dimension=dimension, key=key,
+                defaults={'resolve_histogram': _empty_histogram()}
+            )
+            rollup = Rollup.objects.filter(dimension=dimension, key=key)
+            # Write first: the UPDATE holds the row lock (the database lock on
+            # SQLite) until commit, so the histogram read below is current and
+            # no concurrent resolve can overwrite it before we write it back
+            rollup.update(
+                resolved=F('resolved') + 1,
+                resolve_seconds_total=F('resolve_seconds_total') + seconds,
+                updated_at=timezone.now(),
+            )
+            histogram = rollup.values_list('resolve_histogram', flat=True).get() or _empty_histogram()
+            histogram[bucket] += 1
+            rollup.update(resolve_histogram=histogram)
+
+
+def _lock_rollups():
+    """
+    Blocks incremental rollup writes until the current transaction commits.
+    On SQLite the rebuild's first write already holds the database lock.
+    """
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'LOCK TABLE {connection.ops.quote_name(Rollup._meta.db_table)} IN SHARE ROW EXCLUSIVE MODE'
+            )
+
+
+def rebuild():
+    """
+    Recomputes every rollup from the Interaction table in a single pass.
+    Returns the number of rollup rows written.
+
+    The scan and the swap run in one transaction with incremental writers
+    locked out. Interactions are saved in the same transaction as their
+    rollup update, so each one is either in the scan or applied on top of the
+    rebuilt rows once the lock is released, never both or neither.
+    """
+    with transaction.atomic():
+        _lock_rollups()
+        Rollup.objects.all().delete()
+        totals = _scan()
+        Rollup.objects.bulk_create(
+            [Rollup(dimension=dimension, key=key, **row) for (dimension, key), row in totals.items()],
+            batch_size=1000
+        )
+    return len(totals)
+
+
+def _scan():
+    totals = defaultdict(lambda: {
+        'interactions': 0,
+        'resolved': 0,
+        'resolve_seconds_total': 0.0,
+        'resolve_histogram': _empty_histogram(),
+    })
+    queryset = Interaction.objects.only('concept', 'error_type', 'timestamp', 'session_id', 'resolved_at')
+    for interaction in queryset.iterator(chunk_size=2000):
+        seconds = _resolve_seconds(interaction)
+        for dimension_key in interaction_keys(interaction):
+            row = totals[dimension_key]
+            row['interactions'] += 1
+            if seconds is not None:
+                row['resolved'] += 1
+                row['resolve_seconds_total'] += seconds
+                row['resolve_histogram'][_bucket_index(seconds)] += 1
+    return totals
+
+
+def median_resolve_seconds(rollup):
+    """
+    Approximates the median time-to-resolve from the histogram by linear
+    interpolation inside the bucket holding the middle observation.
+    """
+    histogram = rollup.resolve_histogram or []
+    count = sum(histogram)
+    if not count:
+        return None
+    target = count / 2
+    seen = 0
+    for index, bucket_count in enumerate(histogram):
+        if bucket_count and seen + bucket_count >= target:
+            lower = RESOLVE_BUCKETS[index - 1] if index > 0 else 0
+            upper = RESOLVE_BUCKETS[index] if index < len(RESOLVE_BUCKETS) else lower
+            return lower + (upper - lower) * (target - seen) / bucket_count
+        seen += bucket_count
+    return None
+
+
+def summarize(rollup):
+    return {
+        'key': rollup.key,
+        'interactions': rollup.interactions,
+        'resolved': rollup.resolved,
+        'resolution_rate': rollup.resolved / rollup.interactions if rollup.interactions else 0.0,
+        'median_resolve_seconds': median_resolve_seconds(rollup),
+        'mean_resolve_seconds': rollup.resolve_seconds_total / rollup.resolved if rollup.resolved else None,
+    }
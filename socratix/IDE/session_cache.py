@@ -0,0 +1,106 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import StudentSession
+
+
+class SessionRecord:
+    """In-memory snapshot of a StudentSession row"""
+    __slots__ = ('session_id', 'pk', 'total_score', 'problems_solved', 'loaded_at')
+
+    def __init__(self, session_id, pk=None, total_score=0, problems_solved=0):
+        self.session_id = session_id
+        self.pk = pk
+        self.total_score = total_score
+        self.problems_solved = problems_solved
+        self.loaded_at = time.monotonic()
+
+
+class HotSessionCache:
+    """
+    Bounded LRU of recently active sessions.
+
+    Score polls are served from memory; entries are reloaded after `ttl`
+    seconds to pick up other workers' writes. Unknown sessions are not
+    cached, so a session created elsewhere shows up on the next poll.
+
+    Score changes are written through as F() increments (record_success runs
+    once per fix, so there is nothing worth batching) and the cached entry is
+    replaced by the row as it stands after the write. Writes from this process
+    are serialised, so a slower writer never overwrites a newer snapshot.
+    """
+
+    def __init__(self, max_size=1000, ttl=30.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._records = OrderedDict()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def _load(self, session_id):
+        row = StudentSession.objects.filter(session_id=session_id).values_list(
+            'pk', 'total_score', 'problems_solved'
+        ).first()
+        return SessionRecord(session_id, *row) if row else None
+
+    def _store(self, record):
+        # Caller holds self._lock
+        self._records[record.session_id] = record
+        self._records.move_to_end(record.session_id)
+        while len(self._records) > self.max_size:
+            self._records.popitem(last=False)
+
+    def get(self, session_id):
+        with self._lock:
+            record = self._records.get(session_id)
+            if record is not None and time.monotonic() - record.loaded_at < self.ttl:
+                self._records.move_to_end(session_id)
+                return record
+
+        record = self._load(session_id)
+        if record is None:
+            return SessionRecord(session_id)
+        with self._lock:
+            current = self._records.get(session_id)
+            # A score written while we were loading is newer than what we read
+            if current is not None and current.loaded_at > record.loaded_at:
+                return current
+            self._store(record)
+        return record
+
+    def add_score(self, session_id, points, solved=1):
+        """Adds points to a session, creating its row on first score. Returns the updated record."""
+        with self._write_lock:
+            with transaction.atomic():
+                session, _ = StudentSession.objects.get_or_create(
+                    session_id=session_id,
+                    defaults={'total_score': 0, 'problems_solved': 0}
+                )
+                sessions = StudentSession.objects.filter(pk=session.pk)
+                sessions.update(
+                    total_score=F('total_score') + points,
+                    problems_solved=F('problems_solved') + solved,
+                    last_activity=timezone.now(),
+                )
+                record = SessionRecord(
+                    session_id, *sessions.values_list('pk', 'total_score', 'problems_solved').get()
+                )
+            with self._lock:
+                self._store(record)
+        return record
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+
+hot_sessions = HotSessionCache(
+    max_size=getattr(settings, 'SESSION_CACHE_SIZE', 1000),
+    ttl=getattr(settings, 'SESSION_CACHE_TTL', 30.0),
+)
@@ -0,0 +1,426 @@
+// Global variables
+var editor;
+var pyodide;
+var lastError = "";
+
+var decorations = [];
+var avatarAnim;
+
+// Score tracking variables
+var sessionId = loadSessionId();
+var currentScore = 0;
+var hadErrorBeforeRun = false;
+
+// Problem from the catalog (?problem=<id>); null keeps the default starter code
+var problemId = new URLSearchParams(window.location.search).get('problem');
+
+// Reuse the same session across reloads (localStorage, with the cookie as a
+// fallback for browsers that block storage); the server also reads the cookie
+function loadSessionId() {
+    // Key for both localStorage and the cookie the server reads
+    const storageKey = 'socratix_session';
+    let id = null;
+    try {
+        id = localStorage.getItem(storageKey);
+    } catch (e) { }
+    if (!id) {
+        const match = document.cookie.match(new RegExp('(?:^|; )' + storageKey + '=([^;]*)'));
+        id = match ? decodeURIComponent(match[1]) : null;
+    }
+    if (!id) {
+        id = 'session_' + Date.now() + '_' + Math.random().toString(36).substr(2, 9);
+    }
+    try {
+        localStorage.setItem(storageKey, id);
+    } catch (e) { }
+    document.cookie = `${storageKey}=${encodeURIComponent(id)}; max-age=31536000; path=/; SameSite=Lax`;
+    return id;
+}
+
+// Initialize Monaco
+require.config({ paths: { 'vs': 'https://cdnjs.cloudflare.com/ajax/libs/monaco-editor/0.38.0/min/vs' } });
+require(['vs/editor/editor.main'], function () {
+    editor = monaco.editor.create(document.getElementById('editor-container'), {
+        value: [
+            'def main():',
+            '    print("Hello Everyone!")',
+            '    for i in range(5):',
+            '        print("Counting:", i)',
+            '',
+            'if __name__ == "__main__":',
+            '    main()'
+        ].join('\n'),
+        language: 'python',
+        theme: 'vs-dark',
+        automaticLayout: true,
+        minimap: { enabled: false },
+        fontSize: 14,
+        fontFamily: "'JetBrains Mono', Consolas, monospace",
+        scrollBeyondLastLine: false,
+        renderLineHighlight: "all",
+    });
+    checkReady();
+    loadScore(); // Load score on editor ready
+    loadProblem();
+});
+
+// Replace the default starter code with the selected problem's
+function loadProblem() {
+    if (!problemId) return;
+    fetch(`/api/problems/${encodeURIComponent(problemId)}/`)
+        .then(response => {
+            if (!response.ok) throw new Error(`Problem ${problemId} not found`);
+            return response.json();
+        })
+        .then(problem => {
+            editor.setValue(problem.starter_code);
+            document.title = `${problem.title} - Socratix IDE`;
+        })
+        .catch(err => {
+            console.error('Error loading problem:', err);
+            problemId = null;
+        });
+}
+
+function checkReady() {
+    // Worker readiness is handled via onmessage 'ready'
+}
+
+// Load current score from server
+function loadScore() {
+    fetch(`/api/score/?session_id=${sessionId}`)
+        .then(response => response.json())
+        .then(data => {
+            currentScore = data.score;
+            document.getElementById('score-value').innerText = currentScore;
+        })
+        .catch(err => console.error('Error loading score:', err));
+}
+
+// Show score increase popup animation
+function showScorePopup(points) {
+    const scoreDisplay = document.getElementById('score-display');
+    const popup = document.createElement('div');
+    popup.className = 'score-popup';
+    popup.innerText = `+${points}`;
+    scoreDisplay.appendChild(popup);
+
+    setTimeout(() => {
+        popup.remove();
+    }, 1000);
+}
+
+// Initialize Avatar Paths (static URLs come from the template)
+const avatars = SOCRATIX_STATIC.avatars;
+
+function setAvatarState(state) {
+    const img = document.getElementById('socratis-avatar');
+    if (!img) return;
+
+    // Animation pop effect
+    img.style.transform = "scale(0.9)";
+    setTimeout(() => { img.style.transform = "scale(1)"; }, 150);
+
+    if (avatars[state]) {
+        img.src = avatars[state];
+    } else {
+        img.src = avatars.idle;
+    }
+}
+
+// Initialize Pyodide Worker
+var pyodideWorker;
+var executionTimeout;
+
+function initWorker() {
+    if (pyodideWorker) pyodideWorker.terminate();
+
+    pyodideWorker = new Worker(SOCRATIX_STATIC.worker);
+
+    pyodideWorker.onmessage = function (event) {
+        const { type, content } = event.data;
+
+        if (type === 'ready') {
+            document.getElementById('run-btn').disabled = false;
+            const status = document.getElementById('pyodide-status');
+            status.innerText = "Ready";
+            status.style.color = "var(--success-color)";
+        } else if (type === 'stdout') {
+            addToTerminal(content + "\n");
+        } else if (type === 'stderr') {
+            addToTerminal(content + "\n", true);
+        } else if (type === 'success') {
+            cleanupExecution();
+            setAvatarState('success');
+
+            if (wasBroken) {
+                // Success Nudge Logic
+                const mentorChat = document.getElementById('mentor-chat');
+                const botDiv = document.createElement('div');
+                botDiv.className = 'chat-bubble chat-bot';
+                botDiv.style.borderLeftColor = 'var(--success-color)';
+                botDiv.innerHTML = `<strong style="color: var(--success-color)">Socratis:</strong> Brilliant! You fixed it!`;
+                mentorChat.insertBefore(botDiv, document.getElementById('ask-container'));
+                mentorChat.scrollTop = mentorChat.scrollHeight;
+
+                // NEW: Record success and update score
+                if (hadErrorBeforeRun) {
+                    fetch('/api/score/update/', {
+                        method: 'POST',
+                        headers: { 'Content-Type': 'application/json' },
+                        body: JSON.stringify({ session_id: sessionId })
+                    })
+                        .then(response => response.json())
+                        .then(data => {
+                            if (data.success) {
+                                // Update score display
+                                currentScore = data.new_score;
+                                document.getElementById('score-value').innerText = currentScore;
+
+                                // Show +10 popup
+                                showScorePopup(data.score_gained);
+                            }
+                        })
+                        .catch(err => console.error('Error updating score:', err));
+                }
+
+                wasBroken = false;
+            }
+            lastError = "";
+        } else if (type === 'error') {
+            cleanupExecution();
+            console.error("Worker Error:", content);
+            lastError = content;
+            addToTerminal("\n" + lastError + "\n", true);
+
+            if (lastError.includes("SyntaxError") || lastError.includes("IndentationError")) {
+                setAvatarState('confused');
+            } else {
+                setAvatarState('dizzy');
+            }
+
+            document.getElementById('ask-btn').style.display = 'flex';
+            const chatM = document.getElementById('mentor-chat');
+            chatM.scrollTop = chatM.scrollHeight;
+        }
+    };
+}
+
+initWorker();
+
+// -- UTILS --
+function clearTerminal() {
+    document.getElementById('terminal').innerHTML = "";
+}
+
+function addToTerminal(text, isError = false) {
+    const terminal = document.getElementById('terminal');
+    const span = document.createElement('span');
+    span.className = isError ? 'output-error' : 'output-log';
+    span.innerText = text;
+    terminal.appendChild(span);
+}
+
+function clearDecorations() {
+    decorations = editor.deltaDecorations(decorations, []);
+}
+
+// -- DEMO MODE --
+function loadDemo() {
+    if (!editor) return;
+    const buggyCode = [
+        'def count_down(n):',
+        '    while n > 0:',
+        '        print(n)',
+        '        # Ooops, forgot to decrement!',
+        '        # n = n - 1',
+        '',
+        'count_down(5)'
+    ].join('\n');
+
+    editor.setValue(buggyCode);
+    clearTerminal();
+    addToTerminal("Demo Loaded: Infinite Loop Logic.\nClick RUN.");
+}
+
+var wasBroken = false;
+
+function cleanupExecution() {
+    const runBtn = document.getElementById('run-btn');
+    runBtn.disabled = false;
+    runBtn.innerHTML = `
+        <svg width="14" height="14" viewBox="0 0 24 24" fill="currentColor" stroke="none">
+            <polygon points="5 3 19 12 5 21 5 3"></polygon>
+        </svg>
+        RUN`;
+
+    if (executionTimeout) clearTimeout(executionTimeout);
+
+    setTimeout(() => {
+        if (!lastError) setAvatarState('idle');
+    }, 3000);
+}
+
+// -- RUN LOGIC --
+async function runCode() {
+    console.log("Run clicked");
+    if (!pyodideWorker) {
+        console.error("Worker not ready");
+        return;
+    }
+
+    const runBtn = document.getElementById('run-btn');
+    runBtn.disabled = true;
+    runBtn.innerHTML = 'Executing...';
+
+    clearTerminal();
+    clearDecorations();
+    const userCode = editor.getValue();
+
+    setAvatarState('thinking');
+    document.getElementById('ask-btn').style.display = 'none';
+
+    // Track if there was an error before this run
+    hadErrorBeforeRun = !!lastError;
+    wasBroken = !!lastError;
+    lastError = "";
+
+    // Start Execution
+    pyodideWorker.postMessage({ code: userCode });
+
+    // Set 5s Timeout (Watchdog)
+    executionTimeout = setTimeout(() => {
+        console.warn("Execution timed out!");
+        pyodideWorker.terminate(); // Kill the frozen worker
+
+        addToTerminal("\n\n[Timeout] Code took too long (>5s). Infinite loop detected?\n", true);
+        lastError = "TimeoutError: Infinite Loop Detected";
+
+        setAvatarState('dizzy');
+        document.getElementById('ask-btn').style.display = 'flex';
+
+        // Restart worker for next run
+        initWorker();
+
+        cleanupExecution();
+    }, 5000);
+}
+
+// -- ASK SOCRATIS --
+async function askSocratis() {
+    const mentorChat = document.getElementById('mentor-chat');
+    const askBtn = document.getElementById('ask-btn');
+    const userCode = editor.getValue();
+    const errorMsg = lastError || "No runtime error, but logic seems wrong.";
+
+    setAvatarState('thinking');
+
+    // 1. User Bubble
+    const userDiv = document.createElement('div');
+    userDiv.className = 'chat-bubble chat-user';
+    userDiv.innerText = "Student: " + errorMsg.split('\n')[0];
+    mentorChat.insertBefore(userDiv, document.getElementById('ask-container'));
+
+    // 2. Loading Bubble
+    const loadingDiv = document.createElement('div');
+    loadingDiv.className = 'chat-bubble chat-bot text-dim';
+    loadingDiv.innerText = "Socratix is analyzing logic structure...";
+    loadingDiv.id = "loading-bubble";
+    mentorChat.insertBefore(loadingDiv, document.getElementById('ask-container'));
+
+    askBtn.style.display = 'none';
+    mentorChat.scrollTop = mentorChat.scrollHeight;
+
+    try {
+        const response = await fetch('/api/hint/', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                code: userCode,
+                error: errorMsg,
+                session_id: sessionId,  // Include session ID
+                problem_id: problemId
+            })
+        });
+
+        const data = await response.json();
+        document.getElementById('loading-bubble').remove();
+        setAvatarState('idle');
+
+        // 3. Bot Response Bubble
+        const botDiv = document.createElement('div');
+        botDiv.className = 'chat-bubble chat-bot';
+
+        let contentHTML = "";
+
+        // Concept Badge
+        if (data.concept) {
+            contentHTML += `<div style="font-size: 0.75em; text-transform: uppercase; color: #888; margin-bottom: 4px; letter-spacing: 1px;">${data.concept}</div>`;
+        }
+
+        // Analogy (Italicized)
+        if (data.analogy) {
+            contentHTML += `<p style="margin: 0 0 8px 0; color: #d4d4d4; font-style: italic;">"${data.analogy}"</p>`;
+        }
+
+        // Hint (Main Guiding Question)
+        if (data.hint) {
+            contentHTML += `<p style="margin: 0; font-weight: 500; color: #4ec9b0;">${data.hint}</p>`;
+        }
+
+        botDiv.innerHTML = `<strong style="color: #4ec9b0; display:block; margin-bottom:5px;">Socratix:</strong> ${contentHTML}`;
+        mentorChat.insertBefore(botDiv, document.getElementById('ask-container'));
+
+        // 4. Highlight Line
+        let lineNo = null;
+
+        // Priority 1: LLM provided line number
+        if (data.line_no && data.line_no > 0) {
+            lineNo = parseInt(data.line_no);
+        }
+        // Priority 2: Backend syntax analysis (fallback)
+        else if (data.syntax_line) {
+            lineNo = data.syntax_line;
+        }
+        // Priority 3: Error message regex (last resort)
+        else {
+            const match = errorMsg.match(/line (\d+)/i);
+            if (match) {
+                lineNo = parseInt(match[1]);
+            }
+        }
+
+        if (lineNo) {
+            highlightLine(lineNo);
+        }
+
+        mentorChat.scrollTop = mentorChat.scrollHeight;
+
+    } catch (err) {
+        console.error("API Error:", err);
+        if (document.getElementById('loading-bubble'))
+            document.getElementById('loading-bubble').innerText = "System Failure.";
+    }
+}
+
+function highlightLine(lineNum) {
+    decorations = editor.deltaDecorations(decorations, [
+        {
+            range: new monaco.Range(lineNum, 1, lineNum, 1),
+            options: {
+                isWholeLine: true,
+                className: 'myContentClass',
+                glyphMarginClassName: 'myGlyphMarginClass'
+            }
+        }
+    ]);
+    // Add custom style for highlight if not exists
+    if (!document.getElementById('highlight-style')) {
+        const style = document.createElement('style');
+        style.id = 'highlight-style';
+        style.innerHTML = `
+            .myContentClass { background: rgba(244, 135, 113, 0.2); }
+        `;
+        document.head.appendChild(style);
+    }
+}
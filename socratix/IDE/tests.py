@@ -1,3 +1,230 @@
-from django.test import TestCase
+import threading
+from datetime import timedelta
 
-# Create your tests here.
+from django.db import connection
+from django.core.signals import request_finished
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+
+from . import pipeline, rollups
+from .analysis import parse_error_type
+from .models import Interaction, Rollup, StudentSession
+from .session_cache import HotSessionCache
+from .views import SESSION_COOKIE, _session_id
+
+
+class ParseErrorTypeTests(SimpleTestCase):
+    def test_last_exception_in_traceback_wins(self):
+        log = (
+            'Traceback (most recent call last):\n'
+            '  File "<exec>", line 4, in main\n'
+            'KeyError: 1\n\n'
+            'During handling of the above exception, another exception occurred:\n\n'
+            'NameError: name \'i\' is not defined'
+        )
+        self.assertEqual(parse_error_type(log), 'NameError')
+
+    def test_other_exception_suffixes(self):
+        self.assertEqual(parse_error_type('TimeoutError: Infinite Loop Detected'), 'TimeoutError')
+        self.assertEqual(parse_error_type('SystemExit: 1'), 'SystemExit')
+        self.assertEqual(parse_error_type('KeyboardInterrupt'), 'KeyboardInterrupt')
+
+    def test_no_exception_name(self):
+        self.assertEqual(parse_error_type(''), '')
+        self.assertEqual(parse_error_type(None), '')
+        self.assertEqual(parse_error_type('Program printed nothing'), '')
+
+
+class MedianResolveSecondsTests(SimpleTestCase):
+    def histogram(self, counts):
+        histogram = [0] * (len(rollups.RESOLVE_BUCKETS) + 1)
+        for index, count in counts.items():
+            histogram[index] = count
+        return Rollup(resolve_histogram=histogram)
+
+    def test_empty_histogram(self):
+        self.assertIsNone(rollups.median_resolve_seconds(Rollup(resolve_histogram=[])))
+        self.assertIsNone(rollups.median_resolve_seconds(self.histogram({})))
+
+    def test_interpolates_inside_bucket(self):
+        # All four in the 10-30 s bucket; the median sits halfway through it
+        self.assertEqual(rollups.median_resolve_seconds(self.histogram({1: 4})), 20)
+        # Two in 0-10 s and two in 10-30 s; the median is the top of the first bucket
+        self.assertEqual(rollups.median_resolve_seconds(self.histogram({0: 2, 1: 2})), 10)
+        self.assertEqual(rollups.median_resolve_seconds(self.histogram({0: 1, 2: 3})), 30 + 30 * (1 / 3))
+
+    def test_overflow_bucket(self):
+        overflow = len(rollups.RESOLVE_BUCKETS)
+        self.assertEqual(rollups.median_resolve_seconds(self.histogram({overflow: 1})), rollups.RESOLVE_BUCKETS[-1])
+
+    def test_bucket_index(self):
+        self.assertEqual(rollups._bucket_index(0), 0)
+        self.assertEqual(rollups._bucket_index(10), 0)
+        self.assertEqual(rollups._bucket_index(10.5), 1)
+        self.assertEqual(rollups._bucket_index(10 ** 6), len(rollups.RESOLVE_BUCKETS))
+
+
+class RollupTests(TestCase):
+    def snapshot(self):
+        return {
+            (rollup.dimension, rollup.key): (
+                rollup.interactions, rollup.resolved,
+                round(rollup.resolve_seconds_total, 3), rollup.resolve_histogram,
+            )
+            for rollup in Rollup.objects.all()
+        }
+
+    def interact(self, session_id, concept, error_type, resolve_after=None):
+        interaction = Interaction.objects.create(session_id=session_id, concept=concept, error_type=error_type)
+        rollups.record_interaction(interaction)
+        if resolve_after is not None:
+            interaction.was_resolved = True
+            interaction.resolved_at = interaction.timestamp + timedelta(seconds=resolve_after)
+            interaction.save()
+            rollups.record_resolution(interaction)
+
+    def test_incremental_matches_rebuild(self):
+        self.interact('a', 'Loops', 'NameError', resolve_after=5)
+        self.interact('a', 'Loops', 'NameError')
+        self.interact('b', 'Loops', 'SyntaxError', resolve_after=45)
+        self.interact('b', '', 'SyntaxError', resolve_after=4000)
+        self.interact('c', 'Recursion', '', resolve_after=20)
+        incremental = self.snapshot()
+
+        self.assertEqual(rollups.rebuild(), len(incremental))
+        self.assertEqual(self.snapshot(), incremental)
+
+        loops = Rollup.objects.get(dimension='concept', key='Loops')
+        summary = rollups.summarize(loops)
+        self.assertEqual((summary['interactions'], summary['resolved']), (3, 2))
+        self.assertEqual(summary['mean_resolve_seconds'], 25)
+
+    def test_rebuild_replaces_stale_rows(self):
+        Rollup.objects.create(dimension='concept', key='Gone', interactions=9, resolve_histogram=[])
+        self.interact('a', 'Loops', '')
+
+        rollups.rebuild()
+        self.assertFalse(Rollup.objects.filter(key='Gone').exists())
+        self.assertEqual(Rollup.objects.get(dimension='concept', key='Loops').interactions, 1)
+
+
+class DeferredResponse(pipeline.AfterResponseMixin, HttpResponse):
+    pass
+
+
+class AfterResponseTests(SimpleTestCase):
+    def test_runs_on_close_before_request_finished(self):
+        calls = []
+
+        def finished(**kwargs):
+            calls.append('request_finished')
+
+        request_finished.connect(finished)
+        self.addCleanup(request_finished.disconnect, finished)
+        response = DeferredResponse()
+        pipeline.after_response(response, calls.append, 'persist')
+        self.assertEqual(calls, [])
+
+        response.close()
+        self.assertEqual(calls, ['persist', 'request_finished'])
+
+    def test_failures_are_counted_and_do_not_break_close(self):
+        def flaky_task():
+            raise ValueError('boom')
+
+        before = pipeline.failure_counts().get('flaky_task', 0)
+        response = DeferredResponse()
+        pipeline.after_response(response, flaky_task)
+        with self.assertLogs('IDE.pipeline', level='ERROR'):
+            response.close()
+        self.assertEqual(pipeline.failure_counts()['flaky_task'], before + 1)
+
+    @override_settings(HINT_PIPELINE_DEFER_PERSIST=False)
+    def test_runs_inline_when_not_deferred(self):
+        calls = []
+        pipeline.after_response(DeferredResponse(), calls.append, 'persist')
+        self.assertEqual(calls, ['persist'])
+
+
+class SessionIdTests(SimpleTestCase):
+    def test_numeric_and_missing_session_ids(self):
+        request = RequestFactory().post('/')
+        request.COOKIES[SESSION_COOKIE] = 'from-cookie'
+        self.assertEqual(_session_id(request, {'session_id': 42}), '42')
+        self.assertEqual(_session_id(request, {'session_id': 'x' * 150}), 'x' * 100)
+        self.assertEqual(_session_id(request, {}), 'from-cookie')
+        self.assertEqual(_session_id(RequestFactory().get('/'), {'session_id': ''}), 'default')
+
+
+class HotSessionCacheTests(TestCase):
+    def setUp(self):
+        self.cache = HotSessionCache(max_size=2, ttl=60)
+
+    def test_unknown_session_is_not_cached(self):
+        record = self.cache.get('new')
+        self.assertEqual((record.pk, record.total_score), (None, 0))
+
+        StudentSession.objects.create(session_id='new', total_score=7, problems_solved=1)
+        self.assertEqual(self.cache.get('new').total_score, 7)
+
+    def test_add_score_writes_through(self):
+        record = self.cache.add_score('s1', 5)
+        self.assertEqual((record.total_score, record.problems_solved), (5, 1))
+
+        session = StudentSession.objects.get(session_id='s1')
+        self.assertEqual((session.total_score, session.problems_solved), (5, 1))
+        self.assertEqual(self.cache.get('s1').total_score, 5)
+
+    def test_add_score_includes_other_workers_writes(self):
+        self.cache.add_score('s1', 5)
+        StudentSession.objects.filter(session_id='s1').update(total_score=100)
+
+        self.assertEqual(self.cache.add_score('s1', 5).total_score, 105)
+
+    def test_eviction_keeps_scores(self):
+        for session_id in ('a', 'b', 'c'):
+            self.cache.add_score(session_id, 5)
+
+        self.assertEqual(list(self.cache._records), ['b', 'c'])
+        self.assertEqual(self.cache.get('a').total_score, 5)
+        self.assertEqual(self.cache.add_score('a', 5).total_score, 10)
+        self.assertEqual(StudentSession.objects.get(session_id='a').total_score, 10)
+
+    def test_get_reloads_after_ttl(self):
+        cache = HotSessionCache(max_size=2, ttl=0)
+        cache.add_score('s1', 5)
+        StudentSession.objects.filter(session_id='s1').update(total_score=50)
+
+        self.assertEqual(cache.get('s1').total_score, 50)
+
+
+class HotSessionCacheConcurrencyTests(TransactionTestCase):
+    def test_concurrent_adds_are_not_lost(self):
+        cache = HotSessionCache(max_size=1, ttl=0)
+        errors = []
+
+        def score(session_id, other):
+            try:
+                for _ in range(10):
+                    cache.add_score(session_id, 5)
+                    # Churn the one-entry LRU so records are evicted and reloaded mid-run
+                    cache.add_score(other, 0, solved=0)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=score, args=(sid, f'other-{n}'))
+            for n, sid in enumerate(('s1', 's1', 's2', 's2'))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        for session_id in ('s1', 's2'):
+            session = StudentSession.objects.get(session_id=session_id)
+            self.assertEqual((session.total_score, session.problems_solved), (100, 20))
+            self.assertEqual(cache.get(session_id).total_score, 100)
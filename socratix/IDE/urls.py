@@ -4,7 +4,12 @@ from . import views
 urlpatterns = [
     path('', views.workspace, name='workspace'),
     path('api/hint/', views.get_hint, name='get_hint'),
+    path('api/hint/bulk/', views.bulk_hint, name='bulk_hint'),
     path('api/score/update/', views.record_success, name='record_success'),
     path('api/score/', views.get_score, name='get_score'),
+    path('api/problems/', views.problem_list, name='problem_list'),
+    path('api/problems/<int:problem_id>/', views.problem_detail, name='problem_detail'),
+    path('api/analytics/<str:dimension>/', views.analytics, name='analytics'),
+    path('api/analytics/<str:dimension>/<str:key>/', views.analytics_detail, name='analytics_detail'),
     path('stackframe.js', views.empty_js, name='empty_js'),
 ]
@@ -1,59 +1,188 @@
-from django.shortcuts import render
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from functools import wraps
+from django.template.loader import render_to_string
+from django.utils.cache import patch_cache_control
 from django.views.decorators.csrf import csrf_exempt
-from .models import Interaction, StudentSession
+from .models import Blob, Interaction, Rollup
 from django.utils import timezone
+import hmac
 import json
+import logging
 import os
-from .analysis import analyze_structure
+from .analysis import analyze_structure, parse_error_type
+from . import bulk, pipeline, problems, rollups
+from .session_cache import hot_sessions
+
+logger = logging.getLogger(__name__)
+
+# Cookie (set by workspace.js) that carries the durable session id
+SESSION_COOKIE = 'socratix_session'
 
 # Placeholder for LangChain/OpenAI to avoid direct dependency if not installed yet
 # In a real scenario, you would import:
 # from langchain.chat_models import ChatOpenAI
 # from langchain.schema import HumanMessage, SystemMessage
 
+class CompactJsonResponse(JsonResponse):
+    """JsonResponse without the whitespace json.dumps puts after separators"""
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault('json_dumps_params', {'separators': (',', ':')})
+        super().__init__(data, **kwargs)
+
+
+class DeferredJsonResponse(pipeline.AfterResponseMixin, CompactJsonResponse):
+    """CompactJsonResponse that can run work after it has been sent"""
+
+
 def workspace(request):
-    return render(request, 'workspace.html')
+    # The page has no per-request content, so render it once and reuse the HTML
+    timeout = getattr(settings, 'WORKSPACE_CACHE_SECONDS', 3600)
+    if not timeout:
+        return HttpResponse(render_to_string('workspace.html'))
+    html = cache.get_or_set('IDE:workspace_html', lambda: render_to_string('workspace.html'), timeout)
+    return HttpResponse(html)
+
+def _session_id(request, data):
+    """Session id from the request payload, else the workspace's durable cookie"""
+    session_id = data.get('session_id')
+    if session_id is None or session_id == '':
+        session_id = request.COOKIES.get(SESSION_COOKIE) or 'default'
+    # Clients may send a number; the column is a string
+    return str(session_id)[:100]
+
+
+def _save_interaction(code, error_msg, hint_content, session_id, concept, line_no):
+    # The LLM error fallback appends the exception text; keep one rollup key for it
+    if concept and concept.startswith('System Error'):
+        concept = 'System Error'
+    code_blob = Blob.objects.for_text(code)
+    error_blob = Blob.objects.for_text(error_msg)
+    hint_blob = Blob.objects.for_text(hint_content)
+    # One transaction with the rollup update, so `manage.py rollup` counts it exactly once
+    with transaction.atomic():
+        interaction = Interaction.objects.create(
+            code_blob=code_blob,
+            error_blob=error_blob,
+            hint_blob=hint_blob,
+            session_id=session_id,
+            concept=(concept or '')[:100],
+            error_type=parse_error_type(error_msg)[:100],
+            line_no=line_no
+        )
+        if rollups.incremental_enabled():
+            rollups.record_interaction(interaction)
+
+
+def _timed_hint(timer, code, error_msg, problem_description):
+    from .llm import generate_hint
+    with timer.stage('llm'):
+        return generate_hint(code, error_msg, problem_description)
+
 
 @csrf_exempt
 def get_hint(request):
     if request.method == 'POST':
+        timer = pipeline.StageTimer()
         try:
-            data = json.loads(request.body)
-            code = data.get('code', '')
-            error_msg = data.get('error', '')
-            session_id = data.get('session_id', 'default')
-            
+            with timer.stage('parse'):
+                data = json.loads(request.body)
+                code = data.get('code', '')
+                error_msg = data.get('error', '')
+                session_id = _session_id(request, data)
+                problem_context = problems.get_problem_context(data.get('problem_id'))
+
+            # Start the LLM call first; everything below overlaps with it
+            llm_future = pipeline.start(
+                _timed_hint, timer, code, error_msg, problems.prompt_context(problem_context)
+            )
+
             # Analyze Code Structure (Still useful for providing context)
-            analysis = analyze_structure(code)
-            
-            # Use LLM for Socratic Hint
-            from .llm import generate_hint
-            llm_Response = generate_hint(code, error_msg)
+            with timer.stage('analysis'):
+                analysis = analyze_structure(code)
+
+            with timer.stage('llm_wait'):
+                llm_Response = llm_future.result()
             
             hint_content = f"{llm_Response.get('analogy', '')} {llm_Response.get('hint', '')}"
             concept = llm_Response.get('concept', 'Logic')
+            try:
+                line_no = int(llm_Response.get('line_no') or 0)
+            except (TypeError, ValueError):
+                line_no = 0
 
-            # Save Interaction with session_id
-            Interaction.objects.create(
-                user_code=code,
-                error_log=error_msg,
-                ai_hint=hint_content,
-                session_id=session_id
-            )
-
-            return JsonResponse({
+            result = {
                 'hint': llm_Response.get('hint', ''),
                 'analogy': llm_Response.get('analogy', ''),
-                'analysis': analysis,
                 'concept': concept,
-                'line_no': llm_Response.get('line_no', 0)
-            })
+                'line_no': line_no
+            }
+            # The workspace only needs the analysis to locate syntax errors
+            if analysis.get('status') == 'syntax_error' and analysis.get('line'):
+                result['syntax_line'] = analysis['line']
+            response = DeferredJsonResponse(result)
+
+            # Save Interaction with session_id, after the response is sent when deferred
+            with timer.stage('persist'):
+                pipeline.after_response(
+                    response, _save_interaction, code, error_msg, hint_content, session_id, concept, line_no
+                )
+            if getattr(settings, 'HINT_PIPELINE_TIMING_HEADER', False):
+                response['Server-Timing'] = timer.header()
+            logger.debug(f"get_hint stages: {timer.header()}")
+            return response
 
         except Exception as e:
-            return JsonResponse({'error': str(e)}, status=500)
+            return CompactJsonResponse({'error': str(e)}, status=500)
     
-    return JsonResponse({'error': 'Invalid request'}, status=400)
+    return CompactJsonResponse({'error': 'Invalid request'}, status=400)
+
+
+@csrf_exempt
+def bulk_hint(request):
+    """
+    Runs many (code, error) pairs through the hint generator and streams one
+    JSON result per line as each finishes. Disabled unless BULK_HINT_TOKEN is set.
+
+    Each request has to fit in the web worker timeout: at most
+    BULK_HINT_MAX_ITEMS items, and items not started within
+    BULK_HINT_TIME_BUDGET seconds come back with an 'error' to resubmit.
+    Send larger sets in chunks; use `manage.py rehint` for full re-runs.
+    """
+    if request.method != 'POST':
+        return CompactJsonResponse({'error': 'Invalid request'}, status=400)
+
+    token = getattr(settings, 'BULK_HINT_TOKEN', '')
+    supplied = request.headers.get('Authorization', '')
+    if not token or not hmac.compare_digest(supplied.encode(), f'Bearer {token}'.encode()):
+        return CompactJsonResponse({'error': 'Forbidden'}, status=403)
+
+    try:
+        data = json.loads(request.body)
+        if not isinstance(data, dict):
+            return CompactJsonResponse({'error': 'Body must be a JSON object'}, status=400)
+        items = data.get('items', [])
+        if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+            return CompactJsonResponse({'error': 'items must be a list of objects'}, status=400)
+        max_items = getattr(settings, 'BULK_HINT_MAX_ITEMS', 32)
+        if len(items) > max_items:
+            return CompactJsonResponse({'error': f'At most {max_items} items per request'}, status=400)
+        workers = min(int(data.get('workers', 4)), getattr(settings, 'BULK_HINT_MAX_WORKERS', 8))
+    except (ValueError, TypeError) as e:
+        return CompactJsonResponse({'error': str(e)}, status=400)
+
+    for index, item in enumerate(items):
+        item.setdefault('id', index)
+        if item.get('problem_id') is not None:
+            item['problem_description'] = problems.prompt_context(problems.get_problem_context(item['problem_id']))
+
+    results = bulk.run_bulk(
+        items, max_workers=workers, time_budget=getattr(settings, 'BULK_HINT_TIME_BUDGET', 15.0)
+    )
+    lines = (json.dumps(result, separators=(',', ':')) + '\n' for result in results)
+    return StreamingHttpResponse(lines, content_type='application/x-ndjson')
 
 
 @csrf_exempt
@@ -62,65 +191,119 @@ def record_success(request):
     if request.method == 'POST':
         try:
             data = json.loads(request.body)
-            session_id = data.get('session_id', 'default')
-            
-            # Get or create session
-            session, created = StudentSession.objects.get_or_create(
-                session_id=session_id,
-                defaults={'total_score': 0, 'problems_solved': 0}
-            )
+            session_id = _session_id(request, data)
             
             # Find the last unresolved interaction for this session
             last_interaction = Interaction.objects.filter(
                 session_id=session_id,
                 was_resolved=False,
-                error_log__isnull=False
-            ).exclude(error_log='').order_by('-timestamp').first()
+                error_blob__isnull=False
+            ).order_by('-timestamp').first()
             
             if last_interaction:
                 # Mark as resolved
                 last_interaction.was_resolved = True
                 last_interaction.resolved_at = timezone.now()
-                last_interaction.save()
+                with transaction.atomic():
+                    last_interaction.save()
+                    if rollups.incremental_enabled():
+                        rollups.record_resolution(last_interaction)
                 
-                # Increase score
+                # Increase score (written through; score polls are served from memory)
                 score_gained = 5
-                session.total_score += score_gained
-                session.problems_solved += 1
-                session.save()
+                session = hot_sessions.add_score(session_id, score_gained)
                 
-                return JsonResponse({
+                return CompactJsonResponse({
                     'success': True,
                     'new_score': session.total_score,
                     'score_gained': score_gained
                 })
             
-            return JsonResponse({
+            return CompactJsonResponse({
                 'success': False, 
                 'message': 'No unresolved error found'
             })
         
         except Exception as e:
-            return JsonResponse({'error': str(e)}, status=500)
+            return CompactJsonResponse({'error': str(e)}, status=500)
     
-    return JsonResponse({'error': 'Invalid request'}, status=400)
+    return CompactJsonResponse({'error': 'Invalid request'}, status=400)
 
 
 def get_score(request):
     """Get current session score"""
-    session_id = request.GET.get('session_id', 'default')
-    session = StudentSession.objects.filter(session_id=session_id).first()
-    
-    if session:
-        return JsonResponse({
-            'score': session.total_score,
-            'problems_solved': session.problems_solved
-        })
-    return JsonResponse({'score': 0, 'problems_solved': 0})
+    session = hot_sessions.get(_session_id(request, request.GET))
+    return CompactJsonResponse({
+        'score': session.total_score,
+        'problems_solved': session.problems_solved
+    })
+
+
+def _staff_only(view):
+    """Restricts a JSON view to logged-in staff (analytics expose session ids)"""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not (request.user.is_active and request.user.is_staff):
+            return CompactJsonResponse({'error': 'Forbidden'}, status=403)
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+@_staff_only
+def analytics(request, dimension):
+    """Top rollups for a dimension (concept, error_type, hour or session), most interactions first"""
+    if dimension not in dict(Rollup.DIMENSION_CHOICES):
+        return CompactJsonResponse({'error': 'Unknown dimension'}, status=404)
+    try:
+        limit = min(max(int(request.GET.get('limit', 20)), 1), 200)
+    except ValueError:
+        limit = 20
+
+    top = Rollup.objects.filter(dimension=dimension).order_by('-interactions')[:limit]
+    return CompactJsonResponse({
+        'dimension': dimension,
+        'results': [rollups.summarize(rollup) for rollup in top],
+        # Interactions (and their rollup updates) lost to failed post-response saves in this worker
+        'unsaved_interactions': pipeline.failure_counts().get('_save_interaction', 0),
+    })
+
+
+@_staff_only
+def analytics_detail(request, dimension, key):
+    """Aggregates for a single concept, error type, hour or session"""
+    rollup = Rollup.objects.filter(dimension=dimension, key=key).first()
+    if not rollup:
+        return CompactJsonResponse({'error': 'Not found'}, status=404)
+    return CompactJsonResponse(dict(rollups.summarize(rollup), dimension=dimension))
+
+
+def _cached_json(request, entry):
+    """
+    JSON response with an ETag that browsers must revalidate (no-cache), so
+    problem edits show up immediately while unchanged data costs only a 304
+    (answered by ConditionalGetMiddleware)
+    """
+    response = CompactJsonResponse(entry['public'])
+    response['ETag'] = f'"{entry["etag"]}"'
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+def problem_list(request):
+    """Problem catalog: ids and titles"""
+    return _cached_json(request, problems.get_catalog())
+
+
+def problem_detail(request, problem_id):
+    """Starter code and description for one problem"""
+    context = problems.get_problem_context(problem_id)
+    if not context:
+        return CompactJsonResponse({'error': 'Problem not found'}, status=404)
+    return _cached_json(request, context)
 
 
 def empty_js(request):
     """
     Serve empty JS to silence 404s for source maps or helper scripts like stackframe.js
     """
-    return JsonResponse({}, safe=False)
+    return CompactJsonResponse({}, safe=False)
@@ -6,3 +6,6 @@ pip install -r requirements.txt
 
 python manage.py collectstatic --no-input
 python manage.py migrate
+# Populate analytics rollups the first time; after that they are kept up to date
+# incrementally (run `manage.py rollup` by hand after disabling ANALYTICS_INCREMENTAL)
+python manage.py rollup --if-empty
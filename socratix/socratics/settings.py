@@ -54,8 +54,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First so the rest of the stack shows up in profiles; removes itself when disabled
+    'IDE.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    # After WhiteNoise so precompressed static files bypass it
+    'IDE.middleware.CompressionMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -134,10 +139,77 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# Hashed, precompressed (gzip/brotli) static files with far-future cache headers.
+# Needs `collectstatic`, so it is only enabled outside DEBUG.
+if not DEBUG:
+    STORAGES = {
+        'default': {
+            'BACKEND': 'django.core.files.storage.FileSystemStorage',
+        },
+        'staticfiles': {
+            'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+        },
+    }
+
+# Seconds the rendered workspace page is reused; 0 re-renders on every request
+WORKSPACE_CACHE_SECONDS = env.int("WORKSPACE_CACHE_SECONDS", default=0 if DEBUG else 3600)
+
 
 GEMINI_API_KEY = env("GEMINI_API_KEY", default="")
 # Default to groq for deployment
 LLM_PROVIDER = env("LLM_PROVIDER", default="groq")
 OLLAMA_MODEL = env("OLLAMA_MODEL", default="llama3")
 OLLAMA_BASE_URL = env("OLLAMA_BASE_URL", default="http://localhost:11434")
-GROQ_API_KEY = os.getenv("GROQ_API_KEY") or env("GROQ_API_KEY", default="")
\ No newline at end of file
+GROQ_API_KEY = os.getenv("GROQ_API_KEY") or env("GROQ_API_KEY", default="")
+
+# Content-addressed blob storage for interaction code, errors and hints
+BLOB_COMPRESSION = env.bool("BLOB_COMPRESSION", default=True)
+BLOB_COMPRESS_MIN_SIZE = env.int("BLOB_COMPRESS_MIN_SIZE", default=128)
+BLOB_COMPRESSION_LEVEL = env.int("BLOB_COMPRESSION_LEVEL", default=6)
+
+# Update analytics rollups on every hint/resolve. Disable to rely on a
+# periodic `manage.py rollup` job instead.
+ANALYTICS_INCREMENTAL = env.bool("ANALYTICS_INCREMENTAL", default=True)
+
+# Problem catalog: in-process cache lifetime (seconds)
+PROBLEM_CACHE_TTL = env.int("PROBLEM_CACHE_TTL", default=300)
+
+# Bulk hint endpoint for offline re-hinting/evaluation; disabled when the token is empty.
+# A request must finish inside gunicorn's 30 s worker timeout, so batches are
+# small and stop starting new LLM calls after the time budget; clients send
+# larger sets in chunks (or use `manage.py rehint` for full re-runs).
+BULK_HINT_TOKEN = env("BULK_HINT_TOKEN", default="")
+BULK_HINT_MAX_ITEMS = env.int("BULK_HINT_MAX_ITEMS", default=32)
+BULK_HINT_MAX_WORKERS = env.int("BULK_HINT_MAX_WORKERS", default=8)
+BULK_HINT_TIME_BUDGET = env.float("BULK_HINT_TIME_BUDGET", default=15.0)
+
+# LLM record/replay: 'off', 'record' (save provider responses) or 'replay' (serve them offline)
+LLM_REPLAY_MODE = env("LLM_REPLAY_MODE", default="off")
+LLM_CASSETTE_DIR = env("LLM_CASSETTE_DIR", default=str(BASE_DIR / 'llm_cassettes'))
+LLM_REPLAY_SIMULATE_LATENCY = env.bool("LLM_REPLAY_SIMULATE_LATENCY", default=False)
+
+# get_hint pipeline: overlap analysis with the LLM call, persist interactions once
+# the response has been sent, and report per-stage timings in a Server-Timing header
+HINT_PIPELINE_CONCURRENT = env.bool("HINT_PIPELINE_CONCURRENT", default=True)
+HINT_PIPELINE_DEFER_PERSIST = env.bool("HINT_PIPELINE_DEFER_PERSIST", default=True)
+HINT_PIPELINE_WORKERS = env.int("HINT_PIPELINE_WORKERS", default=8)
+# Timing header is for local diagnosis; don't expose internals to clients in production
+HINT_PIPELINE_TIMING_HEADER = env.bool("HINT_PIPELINE_TIMING_HEADER", default=DEBUG)
+
+# In-process hot-session cache: LRU size and how long an entry is trusted
+# before re-reading it (other workers may have scored)
+SESSION_CACHE_SIZE = env.int("SESSION_CACHE_SIZE", default=1000)
+SESSION_CACHE_TTL = env.float("SESSION_CACHE_TTL", default=30.0)
+# Default idle cutoff for `manage.py sweep_sessions`
+SESSION_RETENTION_DAYS = env.int("SESSION_RETENTION_DAYS", default=90)
+
+# Opt-in request profiling (cProfile + tracemalloc); see `manage.py profile_report`
+PROFILING_ENABLED = env.bool("PROFILING_ENABLED", default=False)
+PROFILING_SAMPLE_RATE = env.float("PROFILING_SAMPLE_RATE", default=0.0)
+PROFILING_HEADER = env("PROFILING_HEADER", default="X-Profile")
+# On-demand profiling requires the header to carry this value; empty disables it
+PROFILING_SECRET = env("PROFILING_SECRET", default="")
+PROFILING_PATHS = env.list("PROFILING_PATHS", default=['/api/hint/'])
+PROFILING_DIR = env("PROFILING_DIR", default=str(BASE_DIR / 'profiles'))
+PROFILING_MAX_FILES = env.int("PROFILING_MAX_FILES", default=500)
+PROFILING_TRACEMALLOC = env.bool("PROFILING_TRACEMALLOC", default=True)